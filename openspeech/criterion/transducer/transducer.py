@@ -26,7 +26,7 @@ from omegaconf import DictConfig
 
 from .. import register_criterion
 from ..transducer.configuration import TransducerLossConfigs
-from ...utils import WARPRNNT_IMPORT_ERROR
+from ...utils import WARPRNNT_IMPORT_ERROR, is_torchaudio_available
 from ...tokenizers.tokenizer import Tokenizer
 
 
@@ -34,6 +34,7 @@ from ...tokenizers.tokenizer import Tokenizer
 class TransducerLoss(nn.Module):
     r"""
     Compute path-aware regularization transducer loss.
+    Uses warp-rnnt when it is installed, and falls back to torchaudio otherwise.
 
     Args:
         configs (DictConfig): hydra configuration set
@@ -67,13 +68,42 @@ class TransducerLoss(nn.Module):
         super().__init__()
         try:
             from warp_rnnt import rnnt_loss
+            self.rnnt_loss = rnnt_loss
         except ImportError:
-            raise ImportError(WARPRNNT_IMPORT_ERROR)
-        self.rnnt_loss = rnnt_loss
+            if not is_torchaudio_available():
+                raise ImportError(WARPRNNT_IMPORT_ERROR)
+            self.rnnt_loss = self._torchaudio_rnnt_loss
         self.blank_id = tokenizer.blank_id
         self.reduction = configs.criterion.reduction
         self.gather = configs.criterion.gather
 
+    @staticmethod
+    def _torchaudio_rnnt_loss(
+            logits: torch.FloatTensor,
+            targets: torch.IntTensor,
+            input_lengths: torch.IntTensor,
+            target_lengths: torch.IntTensor,
+            reduction: str = "mean",
+            blank: int = 0,
+            gather: bool = False,
+    ) -> torch.FloatTensor:
+        r"""
+        Same interface as `warp_rnnt.rnnt_loss`, computed with `torchaudio.functional.rnnt_loss`.
+        `logits` are already log probabilities, and `gather` is ignored as torchaudio always uses the full joint.
+        """
+        from torchaudio.functional import rnnt_loss
+
+        # torchaudio requires the time axis to match the longest input, so padding frames are trimmed.
+        return rnnt_loss(
+            logits[:, :input_lengths.max()].float().contiguous(),
+            targets.int(),
+            input_lengths.int(),
+            target_lengths.int(),
+            blank=blank,
+            reduction=reduction,
+            fused_log_softmax=False,
+        )
+
     def forward(
             self,
             logits: torch.FloatTensor,
@@ -205,6 +205,12 @@ class BaseTrainerConfigs(OpenspeechDataclass):
     save_checkpoint_n_steps: int = field(
         default=10000, metadata={"help": "Save a checkpoint every N steps."}
     )
+    compute_metrics_every_n_steps: int = field(
+        default=100, metadata={"help": "Compute WER and CER every N training steps (N >= 1). "
+                                       "Epoch-level train_wer and train_cer only average the computed steps, "
+                                       "so set it to 1 to report them on every batch as before. "
+                                       "Validation and test always compute them."}
+    )
     auto_scale_batch_size: str = field(
         default="binsearch", metadata={"help": "If set to True, will initially run a batch size finder trying to find "
                                                "the largest batch size that fits into memory."}
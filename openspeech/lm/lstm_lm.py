@@ -20,13 +20,88 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import functools
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import random
+from torch import Tensor
 
 from openspeech.lm.openspeech_lm import OpenspeechLanguageModelBase
 from openspeech.modules import Linear, View
-from typing import Optional, Tuple
+from openspeech.utils import is_torch_compile_available
+from typing import Callable, Optional, Tuple, Union
+
+
+def _lstm_cell(
+        inputs: Tensor,
+        hidden_state: Tensor,
+        cell_state: Tensor,
+        weight_ih: Tensor,
+        weight_hh: Tensor,
+        bias_ih: Tensor,
+        bias_hh: Tensor,
+) -> Tuple[Tensor, Tensor]:
+    r""" Single step of an LSTM layer. """
+    gates = torch.mm(inputs, weight_ih.t()) + torch.mm(hidden_state, weight_hh.t()) + bias_ih + bias_hh
+    input_gate, forget_gate, cell_gate, output_gate = gates.chunk(4, 1)
+
+    input_gate = torch.sigmoid(input_gate)
+    forget_gate = torch.sigmoid(forget_gate)
+    cell_gate = torch.tanh(cell_gate)
+    output_gate = torch.sigmoid(output_gate)
+
+    cell_state = forget_gate * cell_state + input_gate * cell_gate
+    hidden_state = output_gate * torch.tanh(cell_state)
+
+    return hidden_state, cell_state
+
+
+@functools.lru_cache(maxsize=1)
+def _get_lstm_cell() -> Callable[..., Tuple[Tensor, Tensor]]:
+    r"""
+    Return the LSTM cell, scripted on first use so that its pointwise gate operations are fused.
+    TorchScript is deprecated from PyTorch 2.0, where the eager cell is returned and `torch.compile` fuses it instead.
+    """
+    if is_torch_compile_available():
+        return _lstm_cell
+    return torch.jit.script(_lstm_cell)
+
+
+class BatchedHyps(object):
+    r"""
+    Tensor-resident storage of greedy hypotheses for a whole batch.
+    Labels are written with a mask instead of branching per hypothesis in Python.
+
+    Args:
+        batch_size (int): number of hypotheses
+        max_length (int): capacity of the transcripts, the maximum number of decoding steps
+        device (torch.device): device on which the hypotheses are stored
+        pad_id (int, optional): index of the pad symbol written to unused positions (default: 0)
+    """
+    def __init__(
+            self,
+            batch_size: int,
+            max_length: int,
+            device: torch.device,
+            pad_id: int = 0,
+    ) -> None:
+        self.transcripts = torch.full((batch_size, max_length), pad_id, dtype=torch.long, device=device)
+        self.current_lengths = torch.zeros(batch_size, dtype=torch.long, device=device)
+        self._batch_indices = torch.arange(batch_size, device=device)
+
+    def add_results(self, add_mask: torch.Tensor, labels: torch.Tensor) -> None:
+        r"""
+        Append `labels` to the hypotheses selected by `add_mask`.
+
+        Args:
+            add_mask (torch.BoolTensor): hypotheses to update. `BoolTensor` of size ``(batch)``
+            labels (torch.LongTensor): labels to append. `LongTensor` of size ``(batch)``
+        """
+        self.transcripts[self._batch_indices, self.current_lengths] = torch.where(
+            add_mask, labels, self.transcripts[self._batch_indices, self.current_lengths]
+        )
+        self.current_lengths += add_mask.long()
 
 
 class LSTMForLanguageModel(OpenspeechLanguageModelBase):
@@ -82,6 +157,8 @@ class LSTMForLanguageModel(OpenspeechLanguageModelBase):
         self.embedding = nn.Embedding(num_classes, hidden_state_dim)
         self.input_dropout = nn.Dropout(dropout_p)
         rnn_cell = self.supported_rnns[rnn_type.lower()]
+        self.register_buffer("_h0_buf", torch.zeros(0), persistent=False)
+        self.register_buffer("_c0_buf", torch.zeros(0), persistent=False)
         self.rnn = rnn_cell(
             input_size=hidden_state_dim,
             hidden_size=hidden_state_dim,
@@ -99,6 +176,77 @@ class LSTMForLanguageModel(OpenspeechLanguageModelBase):
             Linear(hidden_state_dim, num_classes),
         )
 
+    def _get_initial_hidden_states(self, batch_size: int) -> Optional[Union[Tensor, Tuple[Tensor, Tensor]]]:
+        r"""
+        Return zero initial hidden states for `batch_size` sequences, or None to let the rnn create them.
+        The states are zeroed in place in buffers that are allocated once and grown on demand. Each buffer is flat,
+        so the ``(num_layers, batch, hidden_state_dim)`` view of its prefix is contiguous for any batch size.
+        Buffers are only used with gradients disabled, as autograd may save the initial states for backward.
+        """
+        if torch.is_grad_enabled():
+            return None
+
+        weight = self.embedding.weight
+        numel = self.num_layers * batch_size * self.hidden_state_dim
+        if self._h0_buf.numel() < numel \
+                or self._h0_buf.device != weight.device \
+                or self._h0_buf.dtype != weight.dtype \
+                or self._h0_buf.is_inference() != torch.is_inference_mode_enabled():
+            self._h0_buf = weight.new_zeros(numel)
+            self._c0_buf = weight.new_zeros(numel)
+
+        hidden_states = self._h0_buf[:numel].view(self.num_layers, batch_size, self.hidden_state_dim).zero_()
+        if isinstance(self.rnn, nn.LSTM):
+            cell_states = self._c0_buf[:numel].view(self.num_layers, batch_size, self.hidden_state_dim).zero_()
+            return hidden_states, cell_states
+        return hidden_states
+
+    def _embed(self, input_var: torch.Tensor) -> torch.Tensor:
+        r"""
+        Look up embeddings directly from the embedding weight. A single decoding step gathers the rows of the whole
+        batch with one `index_select`, and a full sequence uses one `F.embedding` call.
+        """
+        if input_var.size(1) == 1:
+            return self.embedding.weight.index_select(0, input_var.reshape(-1)).unsqueeze(1)
+        return F.embedding(input_var, self.embedding.weight)
+
+    def _lstm_step(
+            self,
+            embedded: torch.Tensor,
+            hidden_states: Optional[Tuple[torch.Tensor, torch.Tensor]],
+    ) -> Tuple[torch.Tensor, Tuple[torch.Tensor, torch.Tensor]]:
+        r"""
+        Run a single time step through the stacked LSTM layer by layer with the cell from `_get_lstm_cell`.
+        Takes and returns hidden states in the same layout as :class:`torch.nn.LSTM`.
+        """
+        if hidden_states is None:
+            zeros = embedded.new_zeros(self.num_layers, embedded.size(0), self.hidden_state_dim)
+            hidden_states = (zeros, zeros)
+
+        lstm_cell = _get_lstm_cell()
+        prev_hidden_states, prev_cell_states = hidden_states
+        next_hidden_states, next_cell_states = list(), list()
+        outputs = embedded.squeeze(1)
+
+        for layer_idx in range(self.num_layers):
+            hidden_state, cell_state = lstm_cell(
+                outputs,
+                prev_hidden_states[layer_idx],
+                prev_cell_states[layer_idx],
+                getattr(self.rnn, f"weight_ih_l{layer_idx}"),
+                getattr(self.rnn, f"weight_hh_l{layer_idx}"),
+                getattr(self.rnn, f"bias_ih_l{layer_idx}"),
+                getattr(self.rnn, f"bias_hh_l{layer_idx}"),
+            )
+            next_hidden_states.append(hidden_state)
+            next_cell_states.append(cell_state)
+
+            outputs = hidden_state
+            if layer_idx < self.num_layers - 1:
+                outputs = F.dropout(outputs, p=self.rnn.dropout, training=self.training)
+
+        return outputs.unsqueeze(1), (torch.stack(next_hidden_states), torch.stack(next_cell_states))
+
     def forward_step(
             self,
             input_var: torch.Tensor,
@@ -106,13 +254,16 @@ class LSTMForLanguageModel(OpenspeechLanguageModelBase):
     ) -> Tuple[torch.Tensor, torch.Tensor]:
         batch_size, output_lengths = input_var.size(0), input_var.size(1)
 
-        embedded = self.embedding(input_var)
+        embedded = self._embed(input_var)
         embedded = self.input_dropout(embedded)
 
-        if self.training:
-            self.rnn.flatten_parameters()
+        if isinstance(self.rnn, nn.LSTM) and output_lengths == 1:
+            outputs, hidden_states = self._lstm_step(embedded, hidden_states)
+        else:
+            if self.training:
+                self.rnn.flatten_parameters()
 
-        outputs, hidden_states = self.rnn(embedded, hidden_states)
+            outputs, hidden_states = self.rnn(embedded, hidden_states)
 
         step_outputs = self.fc(outputs.reshape(-1, self.hidden_state_dim)).log_softmax(dim=-1)
         step_outputs = step_outputs.view(batch_size, output_lengths, -1).squeeze(1)
@@ -135,7 +286,7 @@ class LSTMForLanguageModel(OpenspeechLanguageModelBase):
             * logits (torch.FloatTensor): Log probability of model predictions.
         """
         batch_size = inputs.size(0)
-        logits, hidden_states = list(), None
+        logits, hidden_states = list(), self._get_initial_hidden_states(batch_size)
         use_teacher_forcing = True if random.random() < teacher_forcing_ratio else False
 
         if use_teacher_forcing:
@@ -149,10 +300,60 @@ class LSTMForLanguageModel(OpenspeechLanguageModelBase):
         else:
             input_var = inputs[:, 0].unsqueeze(1)
             for di in range(self.max_length):
-                step_output, hidden = self.forward_step(input_var=input_var, hidden_states=hidden_states)
+                step_output, hidden_states = self.forward_step(input_var=input_var, hidden_states=hidden_states)
 
                 step_output = step_output.squeeze(1)
                 logits.append(step_output)
-                input_var = logits[-1].topk(1)[1]
+                input_var = step_output.topk(1)[1]
 
         return torch.stack(logits, dim=1)
+
+    def score(self, inputs: torch.Tensor) -> torch.Tensor:
+        r"""
+        Score a known token sequence in a single pass of the rnn over the whole sequence,
+        instead of feeding predictions back one step at a time.
+
+        Args:
+            inputs (torch.LongTensr): A input sequence passed to decoders. `IntTensor` of size ``(batch, seq_length)``
+
+        Returns:
+            * logits (torch.FloatTensor): Log probability of the next token at every position.
+        """
+        step_outputs, _ = self.forward_step(
+            input_var=inputs,
+            hidden_states=self._get_initial_hidden_states(inputs.size(0)),
+        )
+        return step_outputs.view(inputs.size(0), inputs.size(1), -1)
+
+    def greedy_decode(self, inputs: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        r"""
+        Greedy decoding over the whole batch at once. Stops when every sequence has emitted `eos_id`
+        or `max_length` is reached. Finished sequences keep running but their predictions are masked.
+
+        Args:
+            inputs (torch.LongTensr): A input sequence passed to decoders. `IntTensor` of size ``(batch, seq_length)``
+
+        Returns:
+            * logits (torch.FloatTensor): Log probability of model predictions.
+            * predictions (torch.LongTensor): Predicted labels, padded with `pad_id` after `eos_id`.
+        """
+        batch_size = inputs.size(0)
+        logits, hidden_states = list(), self._get_initial_hidden_states(batch_size)
+        hyps = BatchedHyps(batch_size, max_length=self.max_length, device=inputs.device, pad_id=self.pad_id)
+
+        finished = torch.zeros(batch_size, dtype=torch.bool, device=inputs.device)
+        input_var = inputs[:, 0].unsqueeze(1)
+        num_steps = 0
+
+        while not finished.all() and num_steps < self.max_length:
+            step_output, hidden_states = self.forward_step(input_var=input_var, hidden_states=hidden_states)
+            labels = step_output.argmax(dim=-1)
+
+            hyps.add_results(add_mask=~finished, labels=labels)
+            logits.append(step_output)
+            num_steps += 1
+
+            finished |= labels == self.eos_id
+            input_var = labels.unsqueeze(1)
+
+        return torch.stack(logits, dim=1), hyps.transcripts[:, :num_steps]
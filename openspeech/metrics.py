@@ -69,6 +69,11 @@ class ErrorRate(object):
         total_dist = 0
         total_length = 0
 
+        # Copy each batch to the host once. Decoding reads every label with `.item()`,
+        # which would otherwise synchronize with the device per label.
+        targets = targets.cpu()
+        y_hats = y_hats.cpu()
+
         for (target, y_hat) in zip(targets, y_hats):
             s1 = self.tokenizer.decode(target)
             s2 = self.tokenizer.decode(y_hat)
@@ -211,6 +211,8 @@ class ConformerTransducerConfigs(OpenspeechDataclass):
         rnn_type (str): Type of rnn cell (rnn, lstm, gru) (default: lstm)
         decoder_hidden_state_dim (int): Hidden state dimension of decoder. (default: 640)
         decoder_output_dim (int): Output dimension of decoder. (default: 640)
+        joint_memory_reduction (bool): Flag indication whether to project encoder and decoder outputs separately
+            in the joint network instead of concatenating their expanded copies. (default: False)
         optimizer (str): Optimizer for training. (default: adam)
     """
     model_name: str = field(
@@ -270,6 +272,10 @@ class ConformerTransducerConfigs(OpenspeechDataclass):
     decoder_output_dim: int = field(
         default=640, metadata={"help": "Output dimension of decoder."}
     )
+    joint_memory_reduction: bool = field(
+        default=False, metadata={"help": "Flag indication whether to project encoder and decoder outputs separately "
+                                         "in the joint network instead of concatenating their expanded copies."}
+    )
     optimizer: str = field(
         default="adam", metadata={"help": "Optimizer for training."}
     )
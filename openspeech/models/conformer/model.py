@@ -105,6 +105,7 @@ class ConformerModel(OpenspeechCTCModel):
         logits = self.fc(encoder_outputs).log_softmax(dim=-1)
         return self.collect_outputs(
             stage='train',
+            batch_idx=batch_idx,
             logits=logits,
             output_lengths=output_lengths,
             targets=targets,
@@ -172,6 +172,8 @@ class ContextNetTransducerConfigs(OpenspeechDataclass):
         decoder_output_dim (int, optional): Dimension of decoder output vector (default: 640)
         dropout (float, optional): Dropout probability of decoder (default: 0.1)
         rnn_type (str, optional): Type of rnn cell (rnn, lstm, gru) (default: lstm)
+        joint_memory_reduction (bool): Flag indication whether to project encoder and decoder outputs separately
+            in the joint network instead of concatenating their expanded copies. (default: False)
         optimizer (str): Optimizer for training. (default: adam)
     """
     model_name: str = field(
@@ -210,6 +212,10 @@ class ContextNetTransducerConfigs(OpenspeechDataclass):
     rnn_type: str = field(
         default='lstm', metadata={"help": "Type of rnn cell"}
     )
+    joint_memory_reduction: bool = field(
+        default=False, metadata={"help": "Flag indication whether to project encoder and decoder outputs separately "
+                                         "in the joint network instead of concatenating their expanded copies."}
+    )
     optimizer: str = field(
         default="adam", metadata={"help": "Optimizer for training"}
     )
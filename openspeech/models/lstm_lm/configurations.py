@@ -43,6 +43,7 @@ class LSTMLanguageModelConfigs(OpenspeechDataclass):
         rnn_type (str): Type of rnn cell (rnn, lstm, gru) (default: lstm)
         max_length (int): Max decoding length. (default: 128)
         teacher_forcing_ratio (float): The ratio of teacher forcing. (default: 1.0)
+        use_torch_compile (bool): Compile the decoding step with torch.compile. (default: False)
         optimizer (str): Optimizer for training. (default: adam)
     """
     model_name: str = field(
@@ -66,6 +67,9 @@ class LSTMLanguageModelConfigs(OpenspeechDataclass):
     teacher_forcing_ratio: float = field(
         default=1.0, metadata={"help": "The ratio of teacher forcing. "}
     )
+    use_torch_compile: bool = field(
+        default=False, metadata={"help": "Compile the decoding step with torch.compile. Requires PyTorch 2.0+."}
+    )
     optimizer: str = field(
         default="adam", metadata={"help": "Optimizer for training."}
     )
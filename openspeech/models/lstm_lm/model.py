@@ -20,6 +20,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import logging
+import torch
 from omegaconf import DictConfig
 
 from openspeech.lm.lstm_lm import LSTMForLanguageModel
@@ -27,6 +29,9 @@ from openspeech.models import register_model
 from openspeech.models.lstm_lm.configurations import LSTMLanguageModelConfigs
 from openspeech.models.openspeech_language_model import OpenspeechLanguageModel
 from openspeech.tokenizers.tokenizer import Tokenizer
+from openspeech.utils import is_torch_compile_available
+
+logger = logging.getLogger(__name__)
 
 
 @register_model('lstm_lm', dataclass=LSTMLanguageModelConfigs)
@@ -48,6 +53,7 @@ class LSTMLanguageModel(OpenspeechLanguageModel):
     """
     def __init__(self, configs: DictConfig, tokenizer: Tokenizer) -> None:
         super(LSTMLanguageModel, self).__init__(configs, tokenizer)
+        self.teacher_forcing_ratio = configs.model.teacher_forcing_ratio
 
         self.lm = LSTMForLanguageModel(
             num_classes=self.num_classes,
@@ -60,3 +66,12 @@ class LSTMLanguageModel(OpenspeechLanguageModel):
             num_layers=self.configs.model.num_layers,
             rnn_type=self.configs.model.rnn_type,
         )
+
+        # Only the per-step computation shared by `forward`, `score` and `greedy_decode` is compiled, so the
+        # class name used for dispatch, the state dict keys and the buffer management stay eager.
+        if self.configs.model.use_torch_compile:
+            if is_torch_compile_available():
+                self.lm.forward_step = torch.compile(self.lm.forward_step, dynamic=True)
+            else:
+                logger.warning(f"use_torch_compile requires PyTorch 2.0+, but {torch.__version__} is installed. "
+                               "The decoding step runs eagerly.")
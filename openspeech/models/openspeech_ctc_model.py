@@ -65,6 +65,7 @@ class OpenspeechCTCModel(OpenspeechModel):
             output_lengths: torch.IntTensor,
             targets: torch.IntTensor,
             target_lengths: torch.IntTensor,
+            batch_idx: int = 0,
     ) -> OrderedDict:
         loss = self.criterion(
             log_probs=logits.transpose(0, 1),
@@ -72,14 +73,19 @@ class OpenspeechCTCModel(OpenspeechModel):
             input_lengths=output_lengths,
             target_lengths=target_lengths,
         )
-        predictions = logits.max(-1)[1]
+        wer = cer = None
+        if self.should_compute_metrics(stage, batch_idx):
+            predictions = torch.argmax(logits, dim=-1)
 
-        wer = self.wer_metric(targets[:, 1:], predictions)
-        cer = self.cer_metric(targets[:, 1:], predictions)
+            wer = self.wer_metric(targets[:, 1:], predictions)
+            cer = self.cer_metric(targets[:, 1:], predictions)
+
+            self.info({
+                f"{stage}_wer": wer,
+                f"{stage}_cer": cer,
+            })
 
         self.info({
-            f"{stage}_wer": wer,
-            f"{stage}_cer": cer,
             f"{stage}_loss": loss,
             "learning_rate": self.get_lr(),
         })
@@ -111,7 +117,7 @@ class OpenspeechCTCModel(OpenspeechModel):
         if self.decoder is not None:
             y_hats = self.decoder(logits)
         else:
-            y_hats = logits.max(-1)[1]
+            y_hats = torch.argmax(logits, dim=-1)
         return {
             "predictions": y_hats,
             "logits": logits,
@@ -133,6 +139,7 @@ class OpenspeechCTCModel(OpenspeechModel):
         logits, output_lengths = self.encoder(inputs, input_lengths)
         return self.collect_outputs(
             stage='train',
+            batch_idx=batch_idx,
             logits=logits,
             output_lengths=output_lengths,
             targets=targets,
@@ -20,6 +20,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import torch
 from torch import Tensor
 from collections import OrderedDict
 from typing import Dict
@@ -64,6 +65,7 @@ class OpenspeechEncoderDecoderModel(OpenspeechModel):
             encoder_output_lengths: Tensor,
             targets: Tensor,
             target_lengths: Tensor,
+            batch_idx: int = 0,
     ) -> OrderedDict:
         cross_entropy_loss, ctc_loss = None, None
 
@@ -87,15 +89,16 @@ class OpenspeechEncoderDecoderModel(OpenspeechModel):
         else:
             raise ValueError(f"Unsupported criterion: {self.criterion}")
 
-        predictions = logits.max(-1)[1]
+        predictions = torch.argmax(logits, dim=-1)
 
-        wer = self.wer_metric(targets[:, 1:], predictions)
-        cer = self.cer_metric(targets[:, 1:], predictions)
+        if self.should_compute_metrics(stage, batch_idx):
+            wer = self.wer_metric(targets[:, 1:], predictions)
+            cer = self.cer_metric(targets[:, 1:], predictions)
 
-        self.info({
-            f"{stage}_wer": wer,
-            f"{stage}_cer": cer,
-        })
+            self.info({
+                f"{stage}_wer": wer,
+                f"{stage}_cer": cer,
+            })
 
         return OrderedDict({
             "loss": loss,
@@ -130,7 +133,7 @@ class OpenspeechEncoderDecoderModel(OpenspeechModel):
                 encoder_output_lengths=encoder_output_lengths,
                 teacher_forcing_ratio=0.0,
             )
-            predictions = logits.max(-1)[1]
+            predictions = torch.argmax(logits, dim=-1)
         return {
             "predictions": predictions,
             "logits": logits,
@@ -171,6 +174,7 @@ class OpenspeechEncoderDecoderModel(OpenspeechModel):
 
         return self.collect_outputs(
             stage='train',
+            batch_idx=batch_idx,
             logits=logits,
             encoder_logits=encoder_logits,
             encoder_output_lengths=encoder_output_lengths,
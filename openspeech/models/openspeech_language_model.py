@@ -54,8 +54,9 @@ class OpenspeechLanguageModel(OpenspeechModel):
             logits: torch.Tensor,
             targets: torch.Tensor,
     ) -> OrderedDict:
-        perplexity = self.criterion(logits, targets[:, 1:])
-        predictions = logits.max(-1)[1]
+        # Targets are the inputs shifted by one token, so `logits[:, i]` already scores `targets[:, i]`.
+        perplexity = self.criterion(logits, targets)
+        predictions = torch.argmax(logits, dim=-1)
 
         self.info({
             f"{stage}_perplexity": perplexity,
@@ -69,25 +70,53 @@ class OpenspeechLanguageModel(OpenspeechModel):
             "predictions": predictions,
         })
 
-    def forward(self, inputs: torch.Tensor, input_lengths: torch.Tensor) -> Dict[str, torch.Tensor]:
+    def _autocast(self, device: torch.device) -> torch.autocast:
+        r""" bf16 autocast for inference, enabled only on CUDA devices that support bf16. """
+        enabled = device.type == 'cuda' and torch.cuda.is_bf16_supported()
+        return torch.autocast(device_type=device.type, dtype=torch.bfloat16, enabled=enabled)
+
+    def _forward_lm(
+            self,
+            inputs: torch.Tensor,
+            input_lengths: torch.Tensor,
+            teacher_forcing_ratio: float = 0.0,
+            scoring: bool = False,
+    ) -> torch.Tensor:
+        if get_class_name(self.lm) == 'LSTMForLanguageModel':
+            if scoring:
+                return self.lm.score(inputs)
+            return self.lm(inputs, teacher_forcing_ratio=teacher_forcing_ratio)
+        elif get_class_name(self.lm) == 'TransformerForLanguageModel':
+            return self.lm(inputs, input_lengths)
+        else:
+            raise ValueError(f"Unsupported language model class: {get_class_name(self.lm)}")
+
+    @torch.inference_mode()
+    def forward(
+            self,
+            inputs: torch.Tensor,
+            input_lengths: torch.Tensor,
+            scoring: bool = False,
+    ) -> Dict[str, torch.Tensor]:
         r"""
         Forward propagate a `inputs` and `targets` pair for inference.
 
         Inputs:
             inputs (torch.FloatTensor): A input sequence passed to encoders. Typically for inputs this will be a padded `FloatTensor` of size ``(batch, seq_length, dimension)``.
             input_lengths (torch.LongTensor): The length of input tensor. ``(batch)``
+            scoring (bool): score the given `inputs` in one pass instead of decoding auto-regressively
 
         Returns:
             outputs (dict): Result of model predictions that contains `loss`, `logits`, `targets`, `predictions`.
         """
-        if get_class_name(self.lm) == 'LSTMLanguageModel':
-            logits = self.lm(inputs, teacher_forcing_ratio=0.0)
-        elif get_class_name(self.lm) == 'TransformerLanguageModel':
-            logits = self.lm(inputs, input_lengths)
-        else:
-            raise ValueError(f"Unsupported language model class: {get_class_name(self.lm)}")
+        with self._autocast(inputs.device):
+            if get_class_name(self.lm) == 'LSTMForLanguageModel' and not scoring:
+                logits, predictions = self.lm.greedy_decode(inputs)
+            else:
+                logits = self._forward_lm(inputs, input_lengths, scoring=scoring)
+                predictions = torch.argmax(logits, dim=-1)
+        logits = logits.float()
 
-        predictions = logits.max(-1)[1]
         return {
             "predictions": predictions,
             "logits": logits,
@@ -105,12 +134,7 @@ class OpenspeechLanguageModel(OpenspeechModel):
             loss (torch.Tensor): loss for training
         """
         inputs, input_lengths, targets = batch
-        if get_class_name(self.lm) == 'LSTMLanguageModel':
-            logits = self.lm(inputs, teacher_forcing_ratio=self.teacher_forcing_ratio)
-        elif get_class_name(self.lm) == 'TransformerLanguageModel':
-            logits = self.lm(inputs, input_lengths)
-        else:
-            raise ValueError(f"Unsupported language model class: {get_class_name(self.lm)}")
+        logits = self._forward_lm(inputs, input_lengths, teacher_forcing_ratio=self.teacher_forcing_ratio)
 
         return self.collect_outputs(
             stage='train',
@@ -118,6 +142,7 @@ class OpenspeechLanguageModel(OpenspeechModel):
             targets=targets,
         )
 
+    @torch.inference_mode()
     def validation_step(self, batch: tuple, batch_idx: int) -> OrderedDict:
         r"""
         Forward propagate a `inputs` and `targets` pair for validation.
@@ -130,13 +155,9 @@ class OpenspeechLanguageModel(OpenspeechModel):
             loss (torch.Tensor): loss for training
         """
         inputs, input_lengths, targets = batch
-
-        if get_class_name(self.lm) == 'LSTMLanguageModel':
-            logits = self.lm(inputs, teacher_forcing_ratio=0.0)
-        elif get_class_name(self.lm) == 'TransformerLanguageModel':
-            logits = self.lm(inputs, input_lengths)
-        else:
-            raise ValueError(f"Unsupported language model class: {get_class_name(self.lm)}")
+        with self._autocast(inputs.device):
+            logits = self._forward_lm(inputs, input_lengths, scoring=True)
+        logits = logits.float()
 
         return self.collect_outputs(
             stage='val',
@@ -144,6 +165,7 @@ class OpenspeechLanguageModel(OpenspeechModel):
             targets=targets,
         )
 
+    @torch.inference_mode()
     def test_step(self, batch: tuple, batch_idx: int) -> OrderedDict:
         r"""
         Forward propagate a `inputs` and `targets` pair for test.
@@ -156,13 +178,9 @@ class OpenspeechLanguageModel(OpenspeechModel):
             loss (torch.Tensor): loss for training
         """
         inputs, input_lengths, targets = batch
-
-        if get_class_name(self.lm) == 'LSTMLanguageModel':
-            logits = self.lm(inputs, teacher_forcing_ratio=0.0)
-        elif get_class_name(self.lm) == 'TransformerLanguageModel':
-            logits = self.lm(inputs, input_lengths)
-        else:
-            raise ValueError(f"Unsupported language model class: {get_class_name(self.lm)}")
+        with self._autocast(inputs.device):
+            logits = self._forward_lm(inputs, input_lengths, scoring=True)
+        logits = logits.float()
 
         return self.collect_outputs(
             stage='test',
@@ -61,8 +61,15 @@ class OpenspeechModel(pl.LightningModule):
         self.current_val_loss = 100.0
         self.wer_metric = WordErrorRate(tokenizer)
         self.cer_metric = CharacterErrorRate(tokenizer)
+        self.compute_metrics_every_n_steps = 1
         if hasattr(configs, "trainer"):
             self.gradient_clip_val = configs.trainer.gradient_clip_val
+            if hasattr(configs.trainer, "compute_metrics_every_n_steps"):
+                self.compute_metrics_every_n_steps = configs.trainer.compute_metrics_every_n_steps
+        if self.compute_metrics_every_n_steps < 1:
+            raise ValueError(
+                f"compute_metrics_every_n_steps should be at least 1, got {self.compute_metrics_every_n_steps}"
+            )
         if hasattr(configs, "criterion"):
             self.criterion = self.configure_criterion(configs.criterion.criterion_name)
 
@@ -79,6 +86,17 @@ class OpenspeechModel(pl.LightningModule):
         for key, value in dictionary.items():
             self.log(key, value, prog_bar=True)
 
+    def should_compute_metrics(self, stage: str, batch_idx: int) -> bool:
+        r"""
+        Whether WER and CER should be computed for this step. Decoding predictions into text is done on the host,
+        so during training it only runs every `compute_metrics_every_n_steps` batches.
+
+        Args:
+            stage (str): one of `train`, `val`, `valid`, `test`
+            batch_idx (int): The index of batch
+        """
+        return stage != 'train' or batch_idx % self.compute_metrics_every_n_steps == 0
+
     def forward(self, inputs: torch.FloatTensor, input_lengths: torch.LongTensor) -> Dict[str, Tensor]:
         r"""
         Forward propagate a `inputs` and `targets` pair for inference.
@@ -22,6 +22,7 @@
 
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 import warnings
 from torch import Tensor
 from collections import OrderedDict
@@ -69,6 +70,9 @@ class OpenspeechTransducerModel(OpenspeechModel):
             nn.Tanh(),
             Linear(in_features=in_features, out_features=self.num_classes),
         )
+        self.joint_memory_reduction = False
+        if hasattr(self.configs.model, "joint_memory_reduction"):
+            self.joint_memory_reduction = self.configs.model.joint_memory_reduction
 
     def set_beam_decoder(self, beam_size: int = 3, expand_beam: float = 2.3, state_beam: float = 4.6):
         """ Setting beam search decode """
@@ -89,7 +93,7 @@ class OpenspeechTransducerModel(OpenspeechModel):
             targets: torch.IntTensor,
             target_lengths: torch.IntTensor,
     ) -> OrderedDict:
-        predictions = logits.max(-1)[1]
+        predictions = torch.argmax(logits, dim=-1)
 
         loss = self.criterion(
             logits=logits,
@@ -121,6 +125,21 @@ class OpenspeechTransducerModel(OpenspeechModel):
         decoder_outputs = decoder_outputs.repeat([1, input_length, 1, 1])
         return encoder_outputs, decoder_outputs
 
+    def _memory_reduced_joint(self, encoder_outputs: Tensor, decoder_outputs: Tensor) -> Tensor:
+        r"""
+        Same result as concatenating the expanded outputs and applying `fc`, but the first linear layer is applied
+        to `encoder_outputs` and `decoder_outputs` separately and broadcast-added. The ``(batch, seq_length,
+        target_length, encoder_dim + decoder_dim)`` concatenation is never materialized.
+        """
+        linear = self.fc[0].linear
+        encoder_dim = encoder_outputs.size(-1)
+
+        encoder_outputs = F.linear(encoder_outputs, linear.weight[:, :encoder_dim], linear.bias)
+        decoder_outputs = F.linear(decoder_outputs, linear.weight[:, encoder_dim:])
+
+        outputs = encoder_outputs.unsqueeze(2) + decoder_outputs.unsqueeze(1)
+        return self.fc[1:](outputs).log_softmax(dim=-1)
+
     def joint(self, encoder_outputs: Tensor, decoder_outputs: Tensor) -> Tensor:
         r"""
         Joint `encoder_outputs` and `decoder_outputs`.
@@ -133,6 +152,8 @@ class OpenspeechTransducerModel(OpenspeechModel):
             outputs (torch.FloatTensor): outputs of joint `encoder_outputs` and `decoder_outputs`..
         """
         if encoder_outputs.dim() == 3 and decoder_outputs.dim() == 3:
+            if self.joint_memory_reduction:
+                return self._memory_reduced_joint(encoder_outputs, decoder_outputs)
             encoder_outputs, decoder_outputs = self._expand_for_joint(encoder_outputs, decoder_outputs)
         else:
             assert encoder_outputs.dim() == decoder_outputs.dim()
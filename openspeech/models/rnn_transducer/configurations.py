@@ -46,6 +46,8 @@ class RNNTransducerConfigs(OpenspeechDataclass):
         bidirectional (bool): If True, becomes a bidirectional encoders (default: True)
         rnn_type (str): Type of rnn cell (rnn, lstm, gru) (default: lstm)
         output_dim (int): dimension of model output. (default: 512)
+        joint_memory_reduction (bool): Flag indication whether to project encoder and decoder outputs separately
+            in the joint network instead of concatenating their expanded copies. (default: False)
         optimizer (str): Optimizer for training. (default: adam)
     """
     model_name: str = field(
@@ -78,6 +80,10 @@ class RNNTransducerConfigs(OpenspeechDataclass):
     output_dim: int = field(
         default=512, metadata={"help": "Dimension of outputs"}
     )
+    joint_memory_reduction: bool = field(
+        default=False, metadata={"help": "Flag indication whether to project encoder and decoder outputs separately "
+                                         "in the joint network instead of concatenating their expanded copies."}
+    )
     optimizer: str = field(
         default="adam", metadata={"help": "Optimizer for training."}
     )
@@ -191,6 +191,7 @@ class TransformerWithCTCModel(OpenspeechCTCModel):
         logits = self.fc(logits).log_softmax(dim=-1)
         return self.collect_outputs(
             stage='train',
+            batch_idx=batch_idx,
             logits=logits,
             output_lengths=output_lengths,
             targets=targets,
@@ -49,6 +49,8 @@ class TransformerTransducerConfigs(OpenspeechDataclass):
         decoder_output_dim (int): dimension of model output. (default: 512)
         conv_kernel_size (int): Kernel size of convolution layer. (default: 31)
         max_positional_length (int): Max length of positional encoding. (default: 5000)
+        joint_memory_reduction (bool): Flag indication whether to project encoder and decoder outputs separately
+            in the joint network instead of concatenating their expanded copies. (default: False)
         optimizer (str): Optimizer for training. (default: adam)
     """
     model_name: str = field(
@@ -87,6 +89,10 @@ class TransformerTransducerConfigs(OpenspeechDataclass):
     max_positional_length: int = field(
         default=5000, metadata={"help": "Max length of positional encoding."}
     )
+    joint_memory_reduction: bool = field(
+        default=False, metadata={"help": "Flag indication whether to project encoder and decoder outputs separately "
+                                         "in the joint network instead of concatenating their expanded copies."}
+    )
     optimizer: str = field(
         default="adam", metadata={"help": "Optimizer for training."}
     )
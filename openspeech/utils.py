@@ -24,6 +24,7 @@ import logging
 import torch
 import platform
 import importlib
+import functools
 from collections import OrderedDict
 from typing import Tuple, Union, Iterable
 from omegaconf import DictConfig, OmegaConf
@@ -137,6 +138,10 @@ def is_torchaudio_available():
     return importlib.util.find_spec("torchaudio") is not None
 
 
+def is_torch_compile_available():
+    return int(torch.__version__.split('.')[0]) >= 2
+
+
 BACKENDS_MAPPING = OrderedDict(
     [
         ("torch", (is_pytorch_available, PYTORCH_IMPORT_ERROR)),
@@ -401,10 +406,49 @@ def build_dummy_configs(
 
     return DotDict({
         'model': model_configs,
-        'vocab': vocab_configs,
+        'tokenizer': vocab_configs,
         'criterion': criterion_configs,
         'trainer': trainer_configs,
         'audio': audio_configs,
         'lr_scheduler': scheduler_configs,
     })
 
+
+@functools.lru_cache(maxsize=1)
+def get_dummy_model_and_vocab(
+        model_name: str,
+        criterion_name: str,
+        device: Union[str, torch.device] = 'cpu',
+        **model_configs_kwargs,
+):
+    r"""
+    Build a dummy model with its tokenizer and configuration set once per process, for tests.
+    The returned objects are shared by every caller with the same arguments, so the configuration set is read-only
+    and callers must not train the model, move it to another device or change its attributes.
+    Build a separate model for anything that does.
+
+    Args:
+        model_name (str): name of the registered model
+        criterion_name (str): name of the registered criterion
+        device (str or torch.device): device on which the model is placed (default: cpu)
+        model_configs_kwargs: overrides of the model configuration dataclass
+
+    Returns:
+        model (OpenspeechModel): dummy model
+        vocab (Tokenizer): tokenizer of the dummy model
+        configs (DictConfig): configuration set of the dummy model
+    """
+    from openspeech.models import MODEL_REGISTRY, MODEL_DATACLASS_REGISTRY
+    from openspeech.criterion import CRITERION_DATACLASS_REGISTRY
+    from openspeech.tokenizers.ksponspeech.character import KsponSpeechCharacterTokenizer
+
+    configs = OmegaConf.create(dict(build_dummy_configs(
+        model_configs=MODEL_DATACLASS_REGISTRY[model_name](**model_configs_kwargs),
+        criterion_configs=CRITERION_DATACLASS_REGISTRY[criterion_name](),
+    )))
+    OmegaConf.set_readonly(configs, True)
+
+    vocab = KsponSpeechCharacterTokenizer(configs)
+    model = MODEL_REGISTRY[model_name](configs, vocab).to(device)
+
+    return model, vocab, configs
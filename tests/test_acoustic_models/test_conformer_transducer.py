@@ -1,105 +1,164 @@
+import os
+import time
 import unittest
 import torch
 import logging
 
-from openspeech.criterion.transducer.transducer import TransducerLossConfigs
-from openspeech.models import ConformerTransducerModel, ConformerTransducerConfigs
+from openspeech.models import ConformerTransducerModel
 from openspeech.utils import DUMMY_INPUTS, DUMMY_INPUT_LENGTHS, DUMMY_TARGETS, DUMMY_TARGET_LENGTHS, \
-    build_dummy_configs, WARPRNNT_IMPORT_ERROR
-from openspeech.tokenizers.ksponspeech.character import KsponSpeechCharacterTokenizer
-
-try:
-    from warp_rnnt import rnnt_loss
-except ImportError:
-    raise ImportError(WARPRNNT_IMPORT_ERROR)
+    get_dummy_model_and_vocab
 
 logger = logging.getLogger(__name__)
 
+# Set OPENSPEECH_RNNT_LOSS=numba to also check NeMo's numba RNN-T loss against the model's transducer loss.
+RNNT_LOSS_BACKEND = os.environ.get("OPENSPEECH_RNNT_LOSS", "default")
+
 
 class TestConformerTransducer(unittest.TestCase):
-    def test_forward(self):
-        configs = build_dummy_configs(
-            model_configs=ConformerTransducerConfigs(),
-            criterion_configs=TransducerLossConfigs(),
+    @classmethod
+    def setUpClass(cls):
+        cls.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        cls.use_bf16 = cls.device.type == 'cuda' and torch.cuda.is_bf16_supported()
+        # A reduced encoder keeps the shared model and the models built by single tests small enough for CPU runs.
+        cls.model, cls.vocab, cls.configs = get_dummy_model_and_vocab(
+            "conformer_transducer",
+            "transducer",
+            device=cls.device,
+            encoder_dim=64,
+            num_encoder_layers=2,
+            num_attention_heads=4,
+            joint_memory_reduction=True,
         )
+        # collect_outputs logs the learning rate, so the step tests need the optimizer.
+        cls.model.configure_optimizers()
 
-        vocab = KsponSpeechCharacterTokenizer(configs)
-        model = ConformerTransducerModel(configs, vocab)
+        cls.inputs, cls.input_lengths, cls.targets, cls.target_lengths = [
+            cls._to_device(tensor) for tensor in (DUMMY_INPUTS, DUMMY_INPUT_LENGTHS, DUMMY_TARGETS, DUMMY_TARGET_LENGTHS)
+        ]
 
-        optimizer = torch.optim.Adam(model.parameters(), lr=1e-04)
+    @classmethod
+    def _to_device(cls, tensor):
+        if cls.device.type == 'cuda':
+            return tensor.pin_memory().to(cls.device, non_blocking=True)
+        return tensor
 
+    def setUp(self):
+        self.model.zero_grad(set_to_none=True)
+
+    def _joint_logits(self, model):
+        # Same path as `training_step`: the decoder is fed the targets with the leading sos symbol.
+        encoder_outputs, _, output_lengths = model.encoder(self.inputs, self.input_lengths)
+        decoder_outputs, _ = model.decoder(self.targets, self.target_lengths)
+        return model.joint(encoder_outputs, decoder_outputs), output_lengths
+
+    def test_forward(self):
+        # Train a separate model, as the shared model must not change.
+        model = ConformerTransducerModel(self.configs, self.vocab).to(self.device)
+        params = [p for p in model.parameters() if p.requires_grad]
+        if self.device.type == 'cuda':
+            optimizer = torch.optim.Adam(params, lr=1e-04, fused=True)
+        else:
+            optimizer = torch.optim.Adam(params, lr=1e-04, foreach=True)
+
+        losses = list()
         for i in range(3):
-            outputs = model(DUMMY_INPUTS, DUMMY_INPUT_LENGTHS)
-
-            loss = rnnt_loss(
-                outputs["logits"],
-                DUMMY_TARGETS,
-                outputs["encoder_output_lengths"],
-                DUMMY_TARGET_LENGTHS,
-                reduction="mean",
-                blank=vocab.blank_id,
-                gather=True,
+            optimizer.zero_grad(set_to_none=True)
+            with torch.autocast(device_type=self.device.type, dtype=torch.bfloat16, enabled=self.use_bf16):
+                logits, output_lengths = self._joint_logits(model)
+
+            loss = model.criterion(
+                logits=logits.float(),
+                targets=self.targets[:, 1:].contiguous().int(),
+                input_lengths=output_lengths.int(),
+                target_lengths=self.target_lengths.int(),
             )
             loss.backward()
             optimizer.step()
+            losses.append(loss)
+
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize()
+
+        for loss in losses:
             assert type(loss.item()) == float
 
-    def test_beam_search(self):
-        configs = build_dummy_configs(
-            model_configs=ConformerTransducerConfigs(),
-            criterion_configs=TransducerLossConfigs(),
+    def test_joint_memory_reduction(self):
+        encoder_outputs = torch.randn(3, 12, self.configs.model.encoder_dim, device=self.device)
+        decoder_outputs = torch.randn(3, 5, self.configs.model.decoder_output_dim, device=self.device)
+
+        with torch.no_grad():
+            # The joint without memory reduction, computed directly so the shared model is left unchanged.
+            expected_outputs = torch.cat(self.model._expand_for_joint(encoder_outputs, decoder_outputs), dim=-1)
+            expected_outputs = self.model.fc(expected_outputs).log_softmax(dim=-1)
+            outputs = self.model.joint(encoder_outputs, decoder_outputs)
+
+        assert outputs.size() == (3, 12, 5, self.model.num_classes)
+        assert torch.allclose(outputs, expected_outputs, atol=1e-5)
+
+    def _timed_loss(self, loss_fn, logits):
+        logits = logits.detach().requires_grad_()
+        start = time.perf_counter()
+        loss = loss_fn(logits)
+        loss.sum().backward()
+        if self.device.type == 'cuda':
+            torch.cuda.synchronize()
+        return loss.detach(), time.perf_counter() - start
+
+    @unittest.skipUnless(RNNT_LOSS_BACKEND == "numba", "set OPENSPEECH_RNNT_LOSS=numba to run")
+    def test_numba_rnnt_loss(self):
+        from nemo.collections.asr.parts.numba.rnnt_loss.rnnt_pytorch import RNNTLossNumba
+
+        numba_rnnt_loss = RNNTLossNumba(blank=self.vocab.blank_id, reduction="none")
+        with torch.no_grad():
+            logits, output_lengths = self._joint_logits(self.model)
+        # Both losses require the time axis to match the longest encoder output.
+        logits = logits[:, :output_lengths.max()].contiguous()
+        targets = self.targets[:, 1:].contiguous().int()
+        target_lengths = self.target_lengths.int()
+
+        default_loss, default_elapsed = self._timed_loss(
+            lambda logits: self.model.criterion(
+                logits=logits,
+                targets=targets,
+                input_lengths=output_lengths.int(),
+                target_lengths=target_lengths,
+            ),
+            logits.float(),
         )
+        numba_loss, numba_elapsed = self._timed_loss(
+            lambda logits: numba_rnnt_loss(logits, targets.long(), output_lengths.long(), target_lengths.long()),
+            logits.float(),
+        )
+
+        logger.info(f"RNN-T loss elapsed time (sec) - default: {default_elapsed:.4f}, numba: {numba_elapsed:.4f}")
+        assert torch.allclose(default_loss, numba_loss.mean(), rtol=1e-3, atol=1e-3)
 
-        vocab = KsponSpeechCharacterTokenizer(configs)
-        model = ConformerTransducerModel(configs, vocab)
+    def test_beam_search(self):
+        model = ConformerTransducerModel(self.configs, self.vocab).to(self.device)
         model.set_beam_decode(beam_size=3)
 
         for i in range(3):
-            prediction = model(DUMMY_INPUTS, DUMMY_INPUT_LENGTHS)["predictions"]
+            prediction = model(self.inputs, self.input_lengths)["predictions"]
             assert isinstance(prediction, torch.Tensor)
 
     def test_training_step(self):
-        configs = build_dummy_configs(
-            model_configs=ConformerTransducerConfigs(),
-            criterion_configs=TransducerLossConfigs(),
-        )
-
-        vocab = KsponSpeechCharacterTokenizer(configs)
-        model = ConformerTransducerModel(configs, vocab)
-
         for i in range(3):
-            outputs = model.training_step(
-                batch=(DUMMY_INPUTS, DUMMY_TARGETS, DUMMY_INPUT_LENGTHS, DUMMY_TARGET_LENGTHS), batch_idx=i
+            outputs = self.model.training_step(
+                batch=(self.inputs, self.targets, self.input_lengths, self.target_lengths), batch_idx=i
             )
             assert type(outputs["loss"].item()) == float
 
     def test_validation_step(self):
-        configs = build_dummy_configs(
-            model_configs=ConformerTransducerConfigs(),
-            criterion_configs=TransducerLossConfigs(),
-        )
-
-        vocab = KsponSpeechCharacterTokenizer(configs)
-        model = ConformerTransducerModel(configs, vocab)
-
         for i in range(3):
-            outputs = model.validation_step(
-                batch=(DUMMY_INPUTS, DUMMY_TARGETS, DUMMY_INPUT_LENGTHS, DUMMY_TARGET_LENGTHS), batch_idx=i
+            outputs = self.model.validation_step(
+                batch=(self.inputs, self.targets, self.input_lengths, self.target_lengths), batch_idx=i
             )
             assert type(outputs["loss"].item()) == float
 
     def test_test_step(self):
-        configs = build_dummy_configs(
-            model_configs=ConformerTransducerConfigs(),
-            criterion_configs=TransducerLossConfigs(),
-        )
-
-        vocab = KsponSpeechCharacterTokenizer(configs)
-        model = ConformerTransducerModel(configs, vocab)
-
         for i in range(3):
-            outputs = model.test_step(
-                batch=(DUMMY_INPUTS, DUMMY_TARGETS, DUMMY_INPUT_LENGTHS, DUMMY_TARGET_LENGTHS), batch_idx=i
+            outputs = self.model.test_step(
+                batch=(self.inputs, self.targets, self.input_lengths, self.target_lengths), batch_idx=i
             )
             assert type(outputs["loss"].item()) == float
 
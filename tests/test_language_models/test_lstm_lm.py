@@ -3,9 +3,10 @@ import logging
 import torch
 
 from openspeech.criterion import Perplexity, PerplexityLossConfigs
+from openspeech.lm.lstm_lm import LSTMForLanguageModel
 from openspeech.models.lstm_lm.configurations import LSTMLanguageModelConfigs
 from openspeech.models.lstm_lm.model import LSTMLanguageModel
-from openspeech.utils import DUMMY_LM_INPUTS, DUMMY_LM_TARGETS, build_dummy_configs
+from openspeech.utils import DUMMY_LM_INPUTS, DYMMY_LM_INPUT_LENGTHS, DUMMY_LM_TARGETS, build_dummy_configs
 from openspeech.tokenizers.ksponspeech.character import KsponSpeechCharacterTokenizer
 
 logger = logging.getLogger(__name__)
@@ -21,27 +22,11 @@ class TestLSTMLanguageModel(unittest.TestCase):
         model = LSTMLanguageModel(configs, vocab)
 
         criterion = Perplexity(configs, vocab)
-        optimizer = torch.optim.Adam(model.parameters(), lr=1e-04)
 
         for i in range(3):
-            outputs = model(DUMMY_LM_INPUTS)
+            outputs = model(DUMMY_LM_INPUTS, DYMMY_LM_INPUT_LENGTHS)
             loss = criterion(outputs['logits'], DUMMY_LM_TARGETS)
-            loss.backward()
-            optimizer.step()
-            assert type(loss.item()) == float
-
-        for i in range(3):
-            outputs = model(DUMMY_LM_INPUTS)
-            loss = criterion(outputs['logits'], DUMMY_LM_TARGETS)
-            loss.backward()
-            optimizer.step()
-            assert type(loss.item()) == float
-
-        for i in range(3):
-            outputs = model(DUMMY_LM_INPUTS)
-            loss = criterion(outputs['logits'], DUMMY_LM_TARGETS)
-            loss.backward()
-            optimizer.step()
+            assert not outputs['logits'].requires_grad
             assert type(loss.item()) == float
 
     def test_training_step(self):
@@ -52,9 +37,13 @@ class TestLSTMLanguageModel(unittest.TestCase):
         vocab = KsponSpeechCharacterTokenizer(configs)
         model = LSTMLanguageModel(configs, vocab)
 
+        model.configure_optimizers()
+
         for i in range(5):
-            outputs = model.training_step(batch=(DUMMY_LM_INPUTS, DUMMY_LM_TARGETS), batch_idx=i)
-            assert type(outputs["perplexity"].item()) == float
+            outputs = model.training_step(
+                batch=(DUMMY_LM_INPUTS, DYMMY_LM_INPUT_LENGTHS, DUMMY_LM_TARGETS), batch_idx=i
+            )
+            assert type(outputs["loss"].item()) == float
 
     def test_validation_step(self):
         configs = build_dummy_configs(
@@ -64,9 +53,152 @@ class TestLSTMLanguageModel(unittest.TestCase):
         vocab = KsponSpeechCharacterTokenizer(configs)
         model = LSTMLanguageModel(configs, vocab)
 
+        model.configure_optimizers()
+
         for i in range(5):
-            outputs = model.validation_step(batch=(DUMMY_LM_INPUTS, DUMMY_LM_TARGETS), batch_idx=i)
-            assert type(outputs["perplexity"].item()) == float
+            outputs = model.validation_step(
+                batch=(DUMMY_LM_INPUTS, DYMMY_LM_INPUT_LENGTHS, DUMMY_LM_TARGETS), batch_idx=i
+            )
+            assert type(outputs["loss"].item()) == float
+
+    def test_validation_perplexity(self):
+        configs = build_dummy_configs(
+            model_configs=LSTMLanguageModelConfigs,
+            criterion_configs=PerplexityLossConfigs(),
+        )
+        vocab = KsponSpeechCharacterTokenizer(configs)
+        model = LSTMLanguageModel(configs, vocab).eval()
+        model.configure_optimizers()
+
+        # Same layout as `TextDataset`: inputs start with sos, targets are the same tokens followed by eos.
+        inputs = torch.LongTensor([
+            [vocab.sos_id, 3, 3, 3],
+            [vocab.sos_id, 3, 3, vocab.pad_id],
+        ])
+        targets = torch.LongTensor([
+            [3, 3, 3, vocab.eos_id],
+            [3, 3, vocab.eos_id, vocab.pad_id],
+        ])
+        input_lengths = torch.IntTensor([4, 3])
+
+        with torch.no_grad():
+            log_probs = model.lm.score(inputs).log_softmax(dim=-1)
+        target_log_probs = log_probs.gather(-1, targets.unsqueeze(-1)).squeeze(-1)
+        expected_perplexity = torch.exp(-target_log_probs[targets != vocab.pad_id].mean())
+
+        outputs = model.validation_step(batch=(inputs, input_lengths, targets), batch_idx=0)
+        assert torch.allclose(outputs["loss"], expected_perplexity, rtol=1e-5)
+
+    def test_score(self):
+        model = LSTMForLanguageModel(
+            num_classes=5,
+            max_length=32,
+            hidden_state_dim=64,
+            pad_id=0,
+            sos_id=1,
+            eos_id=2,
+            num_layers=2,
+            rnn_type='lstm',
+        ).eval()
+
+        # Teacher forcing drops eos from the inputs, so the sequences do not contain it.
+        inputs = torch.LongTensor([
+            [1, 3, 3, 4, 3, 0],
+            [1, 4, 4, 3, 0, 0],
+            [1, 3, 4, 3, 4, 3],
+        ])
+
+        with torch.no_grad():
+            logits = model.score(inputs)
+            expected_logits = model(inputs, teacher_forcing_ratio=1.0)
+
+        assert logits.size() == expected_logits.size()
+        assert torch.allclose(logits, expected_logits, atol=1e-6)
+
+    def test_forward_outputs_are_not_reused(self):
+        model = LSTMForLanguageModel(
+            num_classes=5,
+            max_length=8,
+            hidden_state_dim=64,
+            rnn_type='lstm',
+        ).eval()
+        inputs = torch.LongTensor([[1, 3], [1, 4], [1, 3]])
+
+        with torch.no_grad():
+            logits = model(inputs, teacher_forcing_ratio=0.0)
+            expected_logits = logits.clone()
+            greedy_logits, predictions = model.greedy_decode(inputs)
+            expected_greedy_logits, expected_predictions = greedy_logits.clone(), predictions.clone()
+
+            # Decoding starts from the first token, so the second batch differs there.
+            other_inputs = torch.LongTensor([[4, 3], [3, 4], [4, 4]])
+            model(other_inputs, teacher_forcing_ratio=0.0)
+            model.greedy_decode(other_inputs)
+
+        assert torch.equal(logits, expected_logits)
+        assert torch.equal(greedy_logits, expected_greedy_logits)
+        assert torch.equal(predictions, expected_predictions)
+
+    def test_lstm_step(self):
+        model = LSTMForLanguageModel(
+            num_classes=4,
+            max_length=32,
+            hidden_state_dim=64,
+            num_layers=3,
+            rnn_type='lstm',
+        ).eval()
+
+        embedded = torch.randn(3, 1, 64)
+        hidden_states = (torch.randn(3, 3, 64), torch.randn(3, 3, 64))
+
+        with torch.no_grad():
+            outputs, (hidden_state, cell_state) = model._lstm_step(embedded, hidden_states)
+            expected_outputs, (expected_hidden_state, expected_cell_state) = model.rnn(embedded, hidden_states)
+
+        assert torch.allclose(outputs, expected_outputs, atol=1e-6)
+        assert torch.allclose(hidden_state, expected_hidden_state, atol=1e-6)
+        assert torch.allclose(cell_state, expected_cell_state, atol=1e-6)
+
+    def test_greedy_decode(self):
+        model = LSTMForLanguageModel(
+            num_classes=5,
+            max_length=32,
+            hidden_state_dim=64,
+            pad_id=0,
+            sos_id=1,
+            eos_id=2,
+            rnn_type='lstm',
+        ).eval()
+
+        # Rows emit eos at the 2nd, 4th and 1st steps, and keep emitting labels after it.
+        labels = torch.full((3, model.max_length), 4, dtype=torch.long)
+        labels[:, :4] = torch.LongTensor([
+            [3, 2, 3, 3],
+            [3, 3, 3, 2],
+            [2, 3, 3, 3],
+        ])
+        num_steps = [0]
+
+        def forward_step(input_var, hidden_states):
+            step_outputs = torch.nn.functional.one_hot(labels[:, num_steps[0]], model.num_classes).float()
+            num_steps[0] += 1
+            return step_outputs, hidden_states
+
+        model.forward_step = forward_step
+        inputs = torch.LongTensor([[1, 3], [1, 3], [1, 3]])
+
+        for grad_enabled in (False, True):
+            num_steps[0] = 0
+            with torch.set_grad_enabled(grad_enabled):
+                logits, predictions = model.greedy_decode(inputs)
+
+            assert num_steps[0] == 4
+            assert logits.size() == (3, 4, model.num_classes)
+            assert torch.equal(predictions, torch.LongTensor([
+                [3, 2, 0, 0],
+                [3, 3, 3, 2],
+                [2, 0, 0, 0],
+            ]))
 
 
 if __name__ == '__main__':